@@ -0,0 +1,167 @@
+# audio_ingest.py
+# Server-side audio ingestion: PCM decoding, NumPy voice-activity detection
+# and pluggable speech recognizers for the /audio endpoint
+
+import json
+import os
+
+import numpy as np
+
+# ===============================
+# CONFIG
+# ===============================
+SAMPLE_RATE = 16000          # default rate of incoming PCM
+MAX_AUDIO_SECONDS = 30       # longest upload accepted by /audio
+FRAME_MS = 30                # VAD analysis frame
+HANGOVER_MS = 200            # speech kept around each voiced frame
+MIN_SPEECH_MS = 150          # shorter bursts are treated as noise
+MIN_ENERGY = 0.01            # absolute RMS floor (full scale = 1.0)
+NOISE_FACTOR = 3.0           # speech must exceed this multiple of the noise floor
+ZCR_UNVOICED = 0.25          # zero-crossing rate marking fricatives like "s", "f"
+
+VOSK_MODEL_PATH = './models/vosk'
+
+# ===============================
+# PCM
+# ===============================
+def pcm16_to_float(data):
+    """Decode little-endian 16-bit mono PCM bytes into float32 samples in [-1, 1]"""
+    usable = len(data) - len(data) % 2
+    samples = np.frombuffer(data[:usable], dtype='<i2')
+    return samples.astype(np.float32) / 32768.0
+
+
+def read_pcm_stream(stream, max_bytes, chunk_size=8192):
+    """Read a (possibly chunked) request body into a bytearray, up to max_bytes.
+
+    Returns None if the body is longer than max_bytes.
+    """
+    buffer = bytearray()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return buffer
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            return None
+
+# ===============================
+# VOICE ACTIVITY DETECTION
+# ===============================
+def frame_features(samples, frame_len):
+    """Per-frame RMS energy and zero-crossing rate, computed without Python loops"""
+    n_frames = len(samples) // frame_len
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_len - 1)
+    return energy, zcr
+
+
+def detect_speech(samples, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS,
+                  hangover_ms=HANGOVER_MS, min_speech_ms=MIN_SPEECH_MS):
+    """Return a list of (start, end) sample indices of speech segments"""
+    frame_len = int(sample_rate * frame_ms / 1000)
+    if frame_len < 2 or len(samples) < frame_len:
+        return []
+
+    energy, zcr = frame_features(samples, frame_len)
+
+    # Adaptive threshold: the quietest frames estimate the background noise, but
+    # only when the loudest frames stand clear of them. A clip without that
+    # spread is one level throughout (all speech, or all silence), so only the
+    # absolute floor can tell which
+    quiet, loud = np.percentile(energy, [10, 90])
+    if loud > quiet * NOISE_FACTOR:
+        threshold = max(MIN_ENERGY, quiet * NOISE_FACTOR)
+    else:
+        threshold = MIN_ENERGY
+
+    voiced = energy > threshold
+    unvoiced = (energy > threshold * 0.5) & (zcr > ZCR_UNVOICED)
+    speech = voiced | unvoiced
+
+    # Drop bursts too short to be speech (clicks, bumps) before padding
+    min_frames = max(1, min_speech_ms // frame_ms)
+    starts, ends = _runs(speech)
+    for start, end in zip(starts, ends):
+        if end - start < min_frames:
+            speech[start:end] = False
+
+    # Hangover: keep frames near speech so word gaps don't split segments
+    hangover = max(1, hangover_ms // frame_ms)
+    kernel = np.ones(2 * hangover + 1)
+    speech = np.convolve(speech.astype(np.float32), kernel, mode='same') > 0
+
+    starts, ends = _runs(speech)
+    return [(int(start) * frame_len, int(end) * frame_len) for start, end in zip(starts, ends)]
+
+
+def _runs(mask):
+    """Start and end (exclusive) indices of the True runs in a boolean mask"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return edges[0::2], edges[1::2]
+
+# ===============================
+# RECOGNIZERS
+# ===============================
+class Recognizer:
+    """Interface for speech recognizers used by the /audio endpoint"""
+
+    def transcribe(self, samples, sample_rate):
+        """Return the text spoken in float32 samples"""
+        raise NotImplementedError
+
+
+class StubRecognizer(Recognizer):
+    """Returns fixed text (or the result of a callable); for tests and demos"""
+
+    def __init__(self, text=''):
+        self.text = text
+        self.calls = 0
+
+    def transcribe(self, samples, sample_rate):
+        self.calls += 1
+        return self.text(samples, sample_rate) if callable(self.text) else self.text
+
+
+class VoskRecognizer(Recognizer):
+    """Offline recognition with a local Vosk model (pip install vosk)"""
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        from vosk import Model
+        self.model = Model(model_path)
+
+    def transcribe(self, samples, sample_rate):
+        from vosk import KaldiRecognizer
+        recognizer = KaldiRecognizer(self.model, sample_rate)
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get('text', '')
+
+
+def load_recognizer(model_path=VOSK_MODEL_PATH):
+    """Use the offline engine when it and its model are installed, else a stub"""
+    if os.path.isdir(model_path):
+        try:
+            recognizer = VoskRecognizer(model_path)
+            print(f"✓ Loaded offline speech model from {model_path}")
+            return recognizer
+        except ImportError:
+            print("Warning: vosk is not installed; /audio will use the stub recognizer")
+    else:
+        print(f"Warning: no speech model at {model_path}; /audio will use the stub recognizer")
+    return StubRecognizer()
+
+# ===============================
+# PIPELINE
+# ===============================
+def transcribe_speech(samples, sample_rate, recognizer):
+    """Run VAD and send only the speech segments to the recognizer"""
+    segments = detect_speech(samples, sample_rate)
+    texts = []
+    for start, end in segments:
+        text = recognizer.transcribe(samples[start:end], sample_rate).strip()
+        if text:
+            texts.append(text)
+    return ' '.join(texts), segments
@@ -0,0 +1,202 @@
+# compile_training_data.py
+# Build tool: merges training sources into one canonical training file,
+# normalizes and dedupes patterns, and flags ambiguous patterns across tags.
+#
+# Usage:
+#   python compile_training_data.py
+#   python compile_training_data.py -o data/site.json data/a.json data/b.json --threshold 0.9
+
+import argparse
+import json
+import runpy
+import sys
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from intent_store import normalize
+
+DEFAULT_SOURCES = [
+    './data/training_data.json',
+    './data/training_data_2.json',
+    './training.py',
+]
+DEFAULT_OUTPUT = './data/training_data_compiled.json'
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+# Tags used by the flat TRAINING_DATA list that have a different name in the JSON files
+TAG_ALIASES = {
+    'info': 'hospital_info',
+    'records': 'medical_records',
+}
+
+# ===============================
+# LOADING
+# ===============================
+def load_json_source(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    return data.get('intents', []), data.get('default_response')
+
+
+def load_python_source(path):
+    """Load a module defining a flat TRAINING_DATA list of pattern/response/tag dicts"""
+    module = runpy.run_path(path)
+    by_tag = {}
+    for entry in module.get('TRAINING_DATA', []):
+        intent = by_tag.setdefault(entry['tag'], {'tag': entry['tag'], 'patterns': [], 'responses': []})
+        intent['patterns'].append(entry['pattern'])
+        intent['responses'].append(entry['response'])
+    return list(by_tag.values()), module.get('DEFAULT_RESPONSE')
+
+
+def load_source(path):
+    if path.endswith('.py'):
+        return load_python_source(path)
+    return load_json_source(path)
+
+
+def canonical_pattern(text):
+    """preprocess_text normalization with runs of whitespace collapsed"""
+    return ' '.join(normalize(text).split())
+
+# ===============================
+# MERGING
+# ===============================
+def merge_sources(paths):
+    """Merge sources in priority order.
+
+    Patterns are unioned per tag. Responses come from the first source that
+    defines the tag, so a later, more generic source cannot change what an
+    earlier one answers. A pattern seen under two tags stays with the first.
+    """
+    intents = {}
+    owner = {}          # canonical pattern -> tag that kept it
+    stats = {'sources': len(paths), 'patterns_in': 0, 'duplicates': 0}
+    conflicts = []
+    dropped = set()     # (canonical pattern, tag) pairs already reported
+    default_response = None
+
+    for path in paths:
+        raw_intents, source_default = load_source(path)
+        if default_response is None:
+            default_response = source_default
+
+        for raw in raw_intents:
+            tag = TAG_ALIASES.get(raw['tag'], raw['tag'])
+            intent = intents.get(tag)
+            if intent is None:
+                intent = intents[tag] = {'tag': tag, 'patterns': [], 'responses': []}
+                for response in raw.get('responses', []):
+                    if response not in intent['responses']:
+                        intent['responses'].append(response)
+
+            for pattern in raw.get('patterns', []):
+                stats['patterns_in'] += 1
+                canonical = canonical_pattern(pattern)
+                if not canonical:
+                    continue
+                kept_by = owner.get(canonical)
+                if kept_by is None:
+                    owner[canonical] = tag
+                    intent['patterns'].append(canonical)
+                elif kept_by == tag:
+                    stats['duplicates'] += 1
+                elif (canonical, tag) not in dropped:
+                    dropped.add((canonical, tag))
+                    conflicts.append({'pattern': canonical, 'kept': kept_by, 'dropped': tag, 'source': path})
+
+    stats['patterns_out'] = len(owner)
+    return list(intents.values()), default_response, stats, conflicts
+
+# ===============================
+# AMBIGUITY DETECTION
+# ===============================
+def char_ngrams(text, n=3):
+    """Character n-grams of text padded with spaces, so short words still get some"""
+    text = f" {text} "
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def find_near_duplicates(intents, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """Return pattern pairs under different tags with similarity >= threshold.
+
+    Candidates are pairs sharing a character trigram, so inflections like
+    'appointment'/'appointments' are compared even without a common word.
+    SequenceMatcher's cheap upper bounds reject most candidates before the
+    full ratio is computed.
+    """
+    entries = [(pattern, intent['tag']) for intent in intents for pattern in intent['patterns']]
+    grams = [char_ngrams(pattern) for pattern, _ in entries]
+    index = defaultdict(list)
+    for i, pattern_grams in enumerate(grams):
+        for gram in pattern_grams:
+            index[gram].append(i)
+
+    matcher = SequenceMatcher(autojunk=False)
+    results = []
+    for i, (pattern, tag) in enumerate(entries):
+        candidates = set()
+        for gram in grams[i]:
+            candidates.update(j for j in index[gram] if j > i)
+        matcher.set_seq2(pattern)
+        for j in sorted(candidates):
+            other, other_tag = entries[j]
+            if other_tag == tag:
+                continue
+            matcher.set_seq1(other)
+            if (matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold):
+                continue
+            score = matcher.ratio()
+            if score >= threshold:
+                results.append({'score': round(score, 3), 'a': pattern, 'a_tag': tag,
+                                'b': other, 'b_tag': other_tag})
+    results.sort(key=lambda r: -r['score'])
+    return results
+
+# ===============================
+# CLI
+# ===============================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile training sources into one canonical training file")
+    parser.add_argument('sources', nargs='*', default=DEFAULT_SOURCES,
+                        help="JSON intent files or TRAINING_DATA modules, highest priority first")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--threshold', type=float, default=NEAR_DUPLICATE_THRESHOLD,
+                        help="similarity at which patterns under different tags are flagged")
+    parser.add_argument('--report', help="also write the ambiguity report as JSON to this path")
+    parser.add_argument('--strict', action='store_true',
+                        help="exit with status 1 if any ambiguous patterns are found")
+    args = parser.parse_args(argv)
+
+    intents, default_response, stats, conflicts = merge_sources(args.sources)
+    near_duplicates = find_near_duplicates(intents, args.threshold)
+
+    data = {'intents': intents}
+    if default_response is not None:
+        data['default_response'] = default_response
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+        file.write('\n')
+
+    print(f"✓ Compiled {stats['sources']} sources into {args.output}")
+    print(f"  {len(intents)} intents, {stats['patterns_in']} patterns in, {stats['patterns_out']} out "
+          f"({stats['duplicates']} duplicates removed, {len(conflicts)} cross-tag conflicts)")
+
+    for conflict in conflicts:
+        print(f"  CONFLICT '{conflict['pattern']}': kept under '{conflict['kept']}', "
+              f"dropped from '{conflict['dropped']}' ({conflict['source']})")
+    for pair in near_duplicates:
+        print(f"  AMBIGUOUS {pair['score']:.2f} '{pair['a']}' [{pair['a_tag']}] ~ '{pair['b']}' [{pair['b_tag']}]")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as file:
+            json.dump({'stats': stats, 'conflicts': conflicts, 'near_duplicates': near_duplicates},
+                      file, indent=2, ensure_ascii=False)
+
+    if args.strict and (conflicts or near_duplicates):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# emotion_classifier.py
+# Learned emotion classifier: NumPy-only inference over normalized landmarks.
+# Weights are produced by train_emotion_classifier.py; no TensorFlow at runtime.
+
+import os
+
+import numpy as np
+
+import face_tracking
+
+# ===============================
+# CONFIG
+# ===============================
+MODEL_PATH = './models/emotion_classifier.npz'
+
+# Landmarks around the mouth, eyes, brows plus nose/chin/cheeks for pose
+FEATURE_LANDMARKS = [
+    61, 291, 0, 17, 13, 14, 78, 308, 81, 311, 178, 402, 37, 267, 84, 314,      # mouth
+    33, 133, 159, 145, 160, 144, 158, 153,                                     # left eye
+    362, 263, 386, 374, 385, 380, 387, 373,                                    # right eye
+    70, 63, 105, 66, 107, 336, 296, 334, 293, 300,                             # brows
+    1, 152, 234, 454,                                                          # nose, chin, cheeks
+]
+LEFT_EYE_OUTER, RIGHT_EYE_OUTER = 33, 263
+
+# ===============================
+# FEATURES
+# ===============================
+def landmark_features(points):
+    """(faces, points, 2) pixel landmarks -> (faces, features) float32.
+
+    Key landmarks are centered on their mean and scaled by the outer eye
+    corner distance, so position and distance from the camera drop out.
+    The three ratios used by the threshold rules are appended.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    key = points[:, FEATURE_LANDMARKS]
+    center = key.mean(axis=1, keepdims=True)
+    scale = np.linalg.norm(points[:, LEFT_EYE_OUTER] - points[:, RIGHT_EYE_OUTER], axis=1)
+    scale = np.maximum(scale, 1e-6)[:, None, None]
+    shape = ((key - center) / scale).reshape(len(points), -1)
+    ratios = np.nan_to_num(face_tracking.emotion_features(points), posinf=0.0, neginf=0.0)
+    return np.concatenate([shape, ratios], axis=1).astype(np.float32)
+
+# ===============================
+# CLASSIFIER
+# ===============================
+class EmotionClassifier:
+    """Small MLP (or softmax regression with no hidden layer) scored in NumPy"""
+
+    def __init__(self, path=MODEL_PATH):
+        with np.load(path, allow_pickle=False) as weights:
+            self.labels = [str(label) for label in weights['labels']]
+            self.mean = weights['mean']
+            self.std = weights['std']
+            self.layers = []
+            i = 0
+            while f'W{i}' in weights:
+                self.layers.append((weights[f'W{i}'], weights[f'b{i}']))
+                i += 1
+
+    def logits(self, features):
+        x = (features - self.mean) / self.std
+        for i, (W, b) in enumerate(self.layers):
+            x = x @ W + b
+            if i < len(self.layers) - 1:
+                np.maximum(x, 0, out=x)       # ReLU on hidden layers
+        return x
+
+    def predict_proba(self, points):
+        z = self.logits(landmark_features(points))
+        z -= z.max(axis=1, keepdims=True)
+        p = np.exp(z)
+        return p / p.sum(axis=1, keepdims=True)
+
+    def predict(self, points):
+        """One emotion label per face in a (faces, points, 2) array"""
+        if len(points) == 0:
+            return []
+        index = self.logits(landmark_features(points)).argmax(axis=1)
+        return [self.labels[i] for i in index]
+
+# ===============================
+# DROP-IN REPLACEMENTS
+# ===============================
+_classifier = None
+_loaded = False
+
+def get_classifier(path=MODEL_PATH):
+    """Load the exported model once; None if it hasn't been trained yet"""
+    global _classifier, _loaded
+    if not _loaded:
+        _loaded = True
+        if os.path.exists(path):
+            _classifier = EmotionClassifier(path)
+            print(f"✓ Loaded emotion classifier from {path}")
+        else:
+            print(f"Warning: {path} not found; using threshold emotion rules")
+    return _classifier
+
+
+def detect_emotions(points):
+    """Batched emotion labels: learned model if exported, threshold rules otherwise"""
+    classifier = get_classifier()
+    if classifier is None:
+        return face_tracking.detect_emotions(points)
+    return classifier.predict(points)
+
+
+def detect_emotion(landmarks):
+    """Same signature as the threshold-based detect_emotion: list of (x, y) points"""
+    return detect_emotions(np.asarray(landmarks)[None])[0]
@@ -1,15 +1,17 @@
 import cv2
 import mediapipe as mp
 import time
-import math
-from collections import deque, Counter
+from frame_capture import LatestFrameCapture
+from face_tracking import (MAX_FACES, EmotionSmoother, FaceTracker,
+                           face_boxes, landmark_array)
+from emotion_classifier import detect_emotions
 
 # ===============================
 # CONFIG
 # ===============================
 CAMERA_INDEX = 0
 EMOTION_WINDOW = 15          # smoothing window
-GREETING_COOLDOWN = 15       # seconds
+GREETING_COOLDOWN = 15       # seconds, per tracked person
 DEBUG_DRAW = True            # set False for headless mode
 
 # ===============================
@@ -18,72 +20,12 @@ DEBUG_DRAW = True            # set False for headless mode
 mp_face_mesh = mp.solutions.face_mesh
 face_mesh = mp_face_mesh.FaceMesh(
     static_image_mode=False,
-    max_num_faces=1,
+    max_num_faces=MAX_FACES,
     refine_landmarks=True,
     min_detection_confidence=0.5,
     min_tracking_confidence=0.5
 )
 
-# ===============================
-# UTILS
-# ===============================
-def dist(p1, p2):
-    return math.dist(p1, p2)
-
-# ===============================
-# EMOTION DETECTION (GEOMETRY BASED)
-# ===============================
-def detect_emotion(landmarks):
-    """
-    landmarks: list of (x, y) pixel points (length 468)
-    """
-
-    # Mouth
-    left_mouth = landmarks[61]
-    right_mouth = landmarks[291]
-    top_lip = landmarks[13]
-    bottom_lip = landmarks[14]
-
-    # Eye
-    eye_top = landmarks[159]
-    eye_bottom = landmarks[145]
-
-    # Eyebrow
-    eyebrow = landmarks[105]
-    eye_center = landmarks[33]
-
-    mouth_width = dist(left_mouth, right_mouth)
-    mouth_open = dist(top_lip, bottom_lip)
-    eye_open = dist(eye_top, eye_bottom)
-    brow_dist = dist(eyebrow, eye_center)
-
-    # Normalize
-    mouth_ratio = mouth_open / mouth_width
-    eye_ratio = eye_open / mouth_width
-    brow_ratio = brow_dist / mouth_width
-
-    if mouth_ratio > 0.30:
-        return "surprised"
-    elif mouth_ratio > 0.18:
-        return "happy"
-    elif brow_ratio < 0.07:
-        return "angry"
-    elif eye_ratio < 0.03:
-        return "sad"
-    else:
-        return "neutral"
-
-# ===============================
-# EMOTION SMOOTHER
-# ===============================
-class EmotionSmoother:
-    def __init__(self, size=15):
-        self.buffer = deque(maxlen=size)
-
-    def update(self, emotion):
-        self.buffer.append(emotion)
-        return Counter(self.buffer).most_common(1)[0][0]
-
 # ===============================
 # GREETING LOGIC
 # ===============================
@@ -113,58 +55,56 @@ def speak(text):
 # MAIN LOOP
 # ===============================
 def main():
-    cap = cv2.VideoCapture(CAMERA_INDEX)
-    smoother = EmotionSmoother(EMOTION_WINDOW)
+    capture = LatestFrameCapture(CAMERA_INDEX).start()
+    tracker = FaceTracker(lambda: EmotionSmoother(EMOTION_WINDOW))
+    frame = None
 
-    greeted = False
-    last_greet = 0
-
-    while cap.isOpened():
-        ret, frame = cap.read()
+    while capture.is_opened():
+        ret, frame = capture.read(frame)
         if not ret:
             break
 
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         result = face_mesh.process(rgb)
 
-        emotion = "neutral"
-
-        if result.multi_face_landmarks:
-            face_landmarks = result.multi_face_landmarks[0]
+        # Always update the tracker so people who left are evicted
+        now = time.time()
+        faces = result.multi_face_landmarks or []
+        if faces:
             h, w, _ = frame.shape
-
-            points = [
-                (int(lm.x * w), int(lm.y * h))
-                for lm in face_landmarks.landmark
-            ]
-
-            emotion = detect_emotion(points)
-            stable_emotion = smoother.update(emotion)
-
+            points = landmark_array(faces, w, h)
+            boxes = face_boxes(points)
+            emotions = detect_emotions(points)
+        else:
+            boxes, emotions = [], []
+        tracks = tracker.update(boxes, emotions, now)
+
+        for track in tracks:
             if DEBUG_DRAW:
+                x1, y1, x2, y2 = (int(v) for v in track.box)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 1)
                 cv2.putText(
                     frame,
-                    f"Emotion: {stable_emotion}",
-                    (30, 50),
+                    f"#{track.id}: {track.emotion}",
+                    (x1, max(y1 - 10, 20)),
                     cv2.FONT_HERSHEY_SIMPLEX,
-                    1,
+                    0.7,
                     (0, 255, 0),
                     2
                 )
 
-            # Greeting trigger
-            if not greeted and time.time() - last_greet > GREETING_COOLDOWN:
-                greeting = greeting_from_emotion(stable_emotion)
+            # Greeting trigger, with a cooldown per person
+            if track.ready_to_greet(now, GREETING_COOLDOWN):
+                greeting = greeting_from_emotion(track.emotion)
                 speak(greeting)
-                greeted = True
-                last_greet = time.time()
+                track.last_greet = now
 
         if DEBUG_DRAW:
             cv2.imshow("Emotion Greeting Assistant", frame)
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
-    cap.release()
+    capture.stop()
     cv2.destroyAllWindows()
 
 # ===============================
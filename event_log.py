@@ -0,0 +1,179 @@
+# event_log.py
+# Batched asynchronous event log for chat turns and detected emotions.
+# Callers only enqueue; a background thread serializes and writes batches
+# to rotating append-only JSONL files.
+
+import atexit
+import glob
+import json
+import os
+import queue
+import time
+from threading import Event, Thread
+
+# ===============================
+# CONFIG
+# ===============================
+LOG_DIR = './logs'
+FLUSH_INTERVAL = 1.0             # seconds between writes when traffic is light
+BATCH_SIZE = 512                 # events written per batch at most
+QUEUE_SIZE = 10000               # events buffered before new ones are dropped
+MAX_FILE_BYTES = 32 * 1024 * 1024
+MAX_FILES = 20                   # newest log files kept; older ones are deleted on rotation
+
+
+class EventLogger:
+    """Non-blocking event log.
+
+    log() never touches the disk: it timestamps the event and puts it on a
+    bounded queue, dropping it (and counting the drop) if the writer has
+    fallen behind. The writer thread wakes every flush_interval or when a
+    batch fills up, and appends the batch with a single write. Files are
+    rotated to a new name once they reach max_file_bytes, and only the
+    newest max_files are kept, since events hold patient messages. A batch that
+    cannot be written (disk full, directory removed) is counted in lost and
+    the next batch starts a new file.
+    """
+
+    def __init__(self, directory=LOG_DIR, prefix='events', flush_interval=FLUSH_INTERVAL,
+                 batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE, max_file_bytes=MAX_FILE_BYTES,
+                 max_files=MAX_FILES):
+        self.directory = directory
+        self.prefix = prefix
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.written = 0
+        self.lost = 0
+        self._reported_drops = 0
+        self._file = None
+        self._file_bytes = 0
+        self._seq = 0
+        self._stopped = Event()
+        os.makedirs(directory, exist_ok=True)
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # -------------------------------
+    # Hot path (any thread)
+    # -------------------------------
+    def log(self, event_type, /, **fields):
+        """Queue one event; 'type' and 'ts' are set here and can't be fields"""
+        if 'type' in fields or 'ts' in fields:
+            raise ValueError(f"reserved event field in {sorted(fields)}")
+        event = {'type': event_type, 'ts': time.time(), **fields}
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    # -------------------------------
+    # Writer thread
+    # -------------------------------
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if batch:
+                self._write_or_count(batch)
+        # Drain whatever is left on shutdown
+        batch = self._collect(block=False)
+        while batch:
+            self._write_or_count(batch)
+            batch = self._collect(block=False)
+        self._close_file()
+
+    def _collect(self, block=True):
+        """Gather up to batch_size events, waiting at most flush_interval"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                if block:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._stopped.is_set():
+                        break
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        dropped = self.dropped
+        if dropped != self._reported_drops:
+            batch.append({'type': 'dropped', 'ts': time.time(), 'count': dropped - self._reported_drops})
+            self._reported_drops = dropped
+        return batch
+
+    def _write_or_count(self, batch):
+        # A disk error must not kill the writer: drop this batch, keep going
+        try:
+            self._write(batch)
+        except OSError as e:
+            self.lost += len(batch)
+            print(f"Warning: could not write {len(batch)} events ({e}); {self.lost} lost so far")
+            self._close_file()
+
+    def _write(self, batch):
+        data = ''.join(
+            json.dumps(event, separators=(',', ':'), ensure_ascii=False, default=str) + '\n'
+            for event in batch
+        ).encode('utf-8')
+
+        if self._file is None or self._file_bytes + len(data) > self.max_file_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+        self.written += len(batch)
+
+    def _rotate(self):
+        self._close_file()
+        # The directory may have been removed since startup
+        os.makedirs(self.directory, exist_ok=True)
+        # pid keeps each worker process in its own files; seq orders rotations
+        self._seq += 1
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        name = f"{self.prefix}-{stamp}-{os.getpid()}-{self._seq:04d}.jsonl"
+        path = os.path.join(self.directory, name)
+        self._file = open(path, 'ab')
+        self._file_bytes = 0
+        self._prune(keep=path)
+
+    def _prune(self, keep):
+        """Delete the oldest log files beyond max_files (across all processes)"""
+        pattern = os.path.join(glob.escape(self.directory), glob.escape(self.prefix) + '-*.jsonl')
+        paths = []
+        for path in glob.glob(pattern):
+            try:
+                paths.append((os.path.getmtime(path), path))
+            except OSError:      # removed by another process meanwhile
+                pass
+        paths.sort()
+        for _, path in paths[:max(0, len(paths) - self.max_files)]:
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Warning: could not remove old event log {path}: {e}")
+
+    def _close_file(self):
+        # Forget the file even if close fails, so the next batch rotates
+        file, self._file = self._file, None
+        if file is not None:
+            try:
+                file.close()
+            except OSError:
+                pass
+
+    def close(self):
+        """Flush everything queued and stop the writer"""
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self.thread.join(timeout=5.0)
@@ -2,52 +2,21 @@
 import cv2
 import mediapipe as mp
 import time
-import math
-from collections import deque, Counter
 from threading import Thread, Lock
+from frame_capture import LatestFrameCapture
+from face_tracking import MAX_FACES, FaceTracker, face_boxes, landmark_array
+from emotion_classifier import detect_emotion, detect_emotions  # detect_emotion re-exported: other modules import it from here
 
 # Shared state
 latest_greeting = None
 lock = Lock()
 
+GREETING_COOLDOWN = 15   # seconds, per tracked person
+CAMERA_RETRY_DELAY = 2   # seconds before reopening a camera that stopped delivering frames
+
 # ===============================
-# EMOTION UTILS
+# GREETING
 # ===============================
-def dist(p1, p2):
-    return math.dist(p1, p2)
-
-def detect_emotion(landmarks):
-    left_mouth = landmarks[61]
-    right_mouth = landmarks[291]
-    top_lip = landmarks[13]
-    bottom_lip = landmarks[14]
-
-    eye_top = landmarks[159]
-    eye_bottom = landmarks[145]
-
-    eyebrow = landmarks[105]
-    eye_center = landmarks[33]
-
-    mouth_width = dist(left_mouth, right_mouth)
-    mouth_open = dist(top_lip, bottom_lip)
-    eye_open = dist(eye_top, eye_bottom)
-    brow_dist = dist(eyebrow, eye_center)
-
-    mouth_ratio = mouth_open / mouth_width
-    eye_ratio = eye_open / mouth_width
-    brow_ratio = brow_dist / mouth_width
-
-    if mouth_ratio > 0.30:
-        return "surprised"
-    elif mouth_ratio > 0.18:
-        return "happy"
-    elif brow_ratio < 0.07:
-        return "angry"
-    elif eye_ratio < 0.03:
-        return "sad"
-    else:
-        return "neutral"
-
 def greeting_from_emotion(emotion):
     return {
         "happy": "You look happy today. Welcome to our hospital.",
@@ -60,41 +29,58 @@ def greeting_from_emotion(emotion):
 # ===============================
 # BACKGROUND THREAD
 # ===============================
-def start_emotion_engine():
+def start_emotion_engine(events=None):
+    """Camera loop; events is an optional EventLogger for emotion/greeting events"""
     global latest_greeting
 
-    cap = cv2.VideoCapture(0)
+    capture = LatestFrameCapture(0).start()
+    frame = None
     mp_face_mesh = mp.solutions.face_mesh
-    smoother = deque(maxlen=15)
-    greeted = False
+    tracker = FaceTracker()
+    logged_emotions = {}     # track id -> last stable emotion written to the event log
 
     with mp_face_mesh.FaceMesh(
-        max_num_faces=1,
+        max_num_faces=MAX_FACES,
         refine_landmarks=True
     ) as face_mesh:
 
         while True:
-            ret, frame = cap.read()
+            ret, frame = capture.read(frame)
             if not ret:
+                # Camera gone (unplugged, driver reset): reopen after a pause
+                capture.stop()
+                time.sleep(CAMERA_RETRY_DELAY)
+                capture = LatestFrameCapture(0).start()
                 continue
 
             rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             results = face_mesh.process(rgb)
 
-            if results.multi_face_landmarks and not greeted:
+            now = time.time()
+            faces = results.multi_face_landmarks or []
+            if faces:
                 h, w, _ = frame.shape
-                landmarks = [
-                    (int(lm.x * w), int(lm.y * h))
-                    for lm in results.multi_face_landmarks[0].landmark
-                ]
-
-                emotion = detect_emotion(landmarks)
-                smoother.append(emotion)
-                stable_emotion = Counter(smoother).most_common(1)[0][0]
-
-                with lock:
-                    latest_greeting = greeting_from_emotion(stable_emotion)
-
-                greeted = True   # greet once per server run
+                points = landmark_array(faces, w, h)
+                boxes = face_boxes(points)
+                emotions = detect_emotions(points)
+            else:
+                boxes, emotions = [], []
+
+            # Greet each person once per cooldown; /greeting serves the newest
+            for track in tracker.update(boxes, emotions, now):
+                if events is not None and logged_emotions.get(track.id) != track.emotion:
+                    logged_emotions[track.id] = track.emotion
+                    events.log('emotion', track=track.id, emotion=track.emotion)
+                if track.ready_to_greet(now, GREETING_COOLDOWN):
+                    with lock:
+                        latest_greeting = greeting_from_emotion(track.emotion)
+                    track.last_greet = now
+                    if events is not None:
+                        events.log('greeting', track=track.id, emotion=track.emotion,
+                                   greeting=latest_greeting)
+
+            # Forget emotions of tracks the tracker has evicted
+            for track_id in [tid for tid in logged_emotions if tid not in tracker.tracks]:
+                del logged_emotions[track_id]
 
             time.sleep(0.05)
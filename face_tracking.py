@@ -0,0 +1,180 @@
+# face_tracking.py
+# Multi-face support: batched landmark features and lightweight IoU/centroid
+# tracking so each person gets their own emotion smoothing and greeting cooldown
+
+import itertools
+import time
+from collections import deque, Counter
+
+import numpy as np
+
+# ===============================
+# CONFIG
+# ===============================
+MAX_FACES = 5              # FaceMesh max_num_faces
+IOU_THRESHOLD = 0.3        # minimum overlap to continue a track
+MAX_MISSING = 1.0          # seconds a track survives without a detection
+MIN_HITS = 3               # frames seen before a track can be greeted
+
+# Landmark indices used by detect_emotion
+LEFT_MOUTH, RIGHT_MOUTH, TOP_LIP, BOTTOM_LIP = 61, 291, 13, 14
+EYE_TOP, EYE_BOTTOM = 159, 145
+EYEBROW, EYE_CENTER = 105, 33
+
+# ===============================
+# BATCHED FEATURES
+# ===============================
+def landmark_array(multi_face_landmarks, w, h):
+    """Pixel landmarks for every face as one (faces, points, 2) int array"""
+    coords = np.array(
+        [[(lm.x, lm.y) for lm in face.landmark] for face in multi_face_landmarks],
+        dtype=np.float32,
+    )
+    # Truncate like the per-face (int(lm.x * w), int(lm.y * h)) conversion
+    return (coords * np.array([w, h], dtype=np.float32)).astype(np.int32)
+
+
+def face_boxes(points):
+    """(faces, 4) bounding boxes x1, y1, x2, y2 of the landmarks"""
+    return np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1).astype(np.float32)
+
+
+def emotion_features(points):
+    """Mouth, eye and brow ratios for all faces at once, shape (faces, 3)"""
+    points = points.astype(np.float32)
+
+    def dist(a, b):
+        return np.linalg.norm(points[:, a] - points[:, b], axis=1)
+
+    mouth_width = dist(LEFT_MOUTH, RIGHT_MOUTH)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.stack([
+            dist(TOP_LIP, BOTTOM_LIP) / mouth_width,
+            dist(EYE_TOP, EYE_BOTTOM) / mouth_width,
+            dist(EYEBROW, EYE_CENTER) / mouth_width,
+        ], axis=1)
+
+
+def detect_emotions(points):
+    """Vectorized detect_emotion: one label per face in points"""
+    features = emotion_features(points)
+    mouth_ratio, eye_ratio, brow_ratio = features.T
+    labels = np.select(
+        [mouth_ratio > 0.30, mouth_ratio > 0.18, brow_ratio < 0.07, eye_ratio < 0.03],
+        ["surprised", "happy", "angry", "sad"],
+        default="neutral",
+    )
+    return labels.tolist()
+
+# ===============================
+# TRACKING
+# ===============================
+class EmotionSmoother:
+    def __init__(self, size=15):
+        self.buffer = deque(maxlen=size)
+
+    def update(self, emotion):
+        self.buffer.append(emotion)
+        return Counter(self.buffer).most_common(1)[0][0]
+
+
+class Track:
+    __slots__ = ('id', 'box', 'smoother', 'emotion', 'hits', 'last_seen', 'last_greet')
+
+    def __init__(self, track_id, box, smoother, now):
+        self.id = track_id
+        self.box = box
+        self.smoother = smoother
+        self.emotion = "neutral"
+        self.hits = 0
+        self.last_seen = now
+        self.last_greet = None
+
+    def ready_to_greet(self, now, cooldown, min_hits=MIN_HITS):
+        if self.hits < min_hits:
+            return False
+        return self.last_greet is None or now - self.last_greet > cooldown
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between (n, 4) and (m, 4) boxes"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nan_to_num(inter / (area_a[:, None] + area_b[None, :] - inter))
+
+
+class FaceTracker:
+    """Assigns stable IDs to faces across frames.
+
+    Detections are matched to tracks by greedy highest-IoU first; anything
+    left over is matched by centroid distance (within one face width) so
+    fast movement doesn't start a new track. Tracks not seen for max_missing
+    seconds are evicted along with their smoother and greeting state.
+    """
+
+    def __init__(self, smoother_factory=EmotionSmoother, iou_threshold=IOU_THRESHOLD,
+                 max_missing=MAX_MISSING):
+        self.smoother_factory = smoother_factory
+        self.iou_threshold = iou_threshold
+        self.max_missing = max_missing
+        self.tracks = {}
+        self._ids = itertools.count(1)
+
+    def _match(self, boxes):
+        tracks = list(self.tracks.values())
+        matches = {}
+        if not tracks or not len(boxes):
+            return matches
+
+        track_boxes = np.array([track.box for track in tracks], dtype=np.float32)
+        iou = iou_matrix(track_boxes, boxes)
+        free_tracks = set(range(len(tracks)))
+        free_boxes = set(range(len(boxes)))
+        for t, d in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+            if iou[t, d] < self.iou_threshold:
+                break
+            if t in free_tracks and d in free_boxes:
+                matches[int(d)] = tracks[t]
+                free_tracks.discard(t)
+                free_boxes.discard(d)
+
+        if free_tracks and free_boxes:
+            centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+            track_centers = (track_boxes[:, :2] + track_boxes[:, 2:]) / 2
+            dist = np.linalg.norm(track_centers[:, None] - centers[None, :], axis=2)
+            widths = track_boxes[:, 2] - track_boxes[:, 0]
+            for t, d in zip(*np.unravel_index(np.argsort(dist, axis=None), dist.shape)):
+                if t in free_tracks and d in free_boxes and dist[t, d] < widths[t]:
+                    matches[int(d)] = tracks[t]
+                    free_tracks.discard(t)
+                    free_boxes.discard(d)
+        return matches
+
+    def update(self, boxes, emotions, now=None):
+        """Update tracks with this frame's faces; returns one Track per face"""
+        now = time.time() if now is None else now
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        matches = self._match(boxes)
+
+        result = []
+        for d, (box, emotion) in enumerate(zip(boxes, emotions)):
+            track = matches.get(d)
+            if track is None:
+                track = Track(next(self._ids), box, self.smoother_factory(), now)
+                self.tracks[track.id] = track
+            track.box = box
+            track.hits += 1
+            track.last_seen = now
+            track.emotion = track.smoother.update(emotion)
+            result.append(track)
+
+        for track_id in [tid for tid, track in self.tracks.items()
+                         if now - track.last_seen > self.max_missing]:
+            del self.tracks[track_id]
+        return result
@@ -0,0 +1,113 @@
+# frame_capture.py
+# Decoupled camera capture: a background thread keeps only the latest frame
+
+import time
+from threading import Condition, Thread
+
+import cv2
+import numpy as np
+
+MAX_READ_FAILURES = 20     # consecutive failed reads before the camera is considered gone
+READ_RETRY_DELAY = 0.05    # seconds, grows linearly with consecutive failures (max 0.5)
+
+
+class LatestFrameCapture:
+    """Reads frames on a background thread into a single latest-frame slot.
+
+    Capture is double-buffered: the thread decodes into a preallocated back
+    buffer and swaps it with the front buffer, so the driver queue is always
+    drained and processing never sees a stale frame. Frames that are replaced
+    before anyone reads them are dropped and counted, never queued.
+    """
+
+    def __init__(self, source=0):
+        self.cap = cv2.VideoCapture(source)
+        self._buffers = [None, None]   # allocated from the first frame's shape
+        self._front = 0
+        self._seq = 0                  # sequence number of the frame in the front buffer
+        self._read_seq = 0             # last sequence number handed to a reader
+        self._running = False
+        self._cond = Condition()
+        self.captured = 0
+        self.dropped = 0
+        self.thread = None
+
+    def is_opened(self):
+        """True while the camera is open and the capture thread (if started) is alive"""
+        if self.thread is not None and not self.thread.is_alive():
+            return False
+        return self.cap.isOpened()
+
+    def start(self):
+        self._running = True
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        failures = 0
+        while self._running:
+            back = 1 - self._front
+            ret, frame = self.cap.read(self._buffers[back])
+            if not ret:
+                # Cameras drop the odd frame; back off and retry before giving up
+                failures += 1
+                if failures >= MAX_READ_FAILURES or not self.cap.isOpened():
+                    print(f"Capture ended after {failures} failed reads")
+                    break
+                time.sleep(min(READ_RETRY_DELAY * failures, 0.5))
+                continue
+            failures = 0
+            # cv2 reuses the buffer when shape matches, otherwise allocates a new one
+            self._buffers[back] = frame
+
+            with self._cond:
+                if self._seq > self._read_seq:
+                    self.dropped += 1
+                self._front = back
+                self._seq += 1
+                self.captured += 1
+                self._cond.notify_all()
+
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def read(self, out=None, timeout=None):
+        """Wait for a frame newer than the last one read and copy it into out.
+
+        Returns (ret, frame) like cv2.VideoCapture.read; ret is False only
+        once the capture has ended. Raises TimeoutError if timeout (seconds)
+        passes first. Pass the previously returned frame as out to reuse its
+        memory.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._seq <= self._read_seq:
+                if not self._running:
+                    return False, None
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("no new frame from the camera")
+                self._cond.wait(remaining)
+
+            # Copy under the lock: the capture thread can't swap mid-copy,
+            # and only ever writes into the back buffer
+            front = self._buffers[self._front]
+            if out is None or out.shape != front.shape or out.dtype != front.dtype:
+                out = np.empty_like(front)
+            np.copyto(out, front)
+            self._read_seq = self._seq
+        return True, out
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.cap.release()
+        print(f"Capture stopped: {self.captured} frames captured, {self.dropped} dropped")
@@ -1,89 +1,37 @@
 import cv2
+import json
 import mediapipe as mp
 import time
-import math
-import pyttsx3
-from collections import deque, Counter
+from frame_capture import LatestFrameCapture
+from face_tracking import (MAX_FACES, EmotionSmoother, FaceTracker,
+                           face_boxes, landmark_array)
+from emotion_classifier import detect_emotions
+from tts_worker import TTSWorker
 
 # ===============================
 # CONFIG
 # ===============================
 CAMERA_INDEX = 0
 EMOTION_WINDOW = 15      # frames for smoothing
-GREETING_COOLDOWN = 15   # seconds
+GREETING_COOLDOWN = 15   # seconds, per tracked person
 DEBUG_DRAW = True        # False = no window
+TRAINING_DATA_PATH = "./data/training_data.json"
 
 # ===============================
 # TTS
 # ===============================
-tts = pyttsx3.init()
-tts.setProperty("rate", 170)
+tts = TTSWorker(rate=170)
 
 def speak(text):
-    print(f"[SPEAK]: {text}")
-    tts.say(text)
-    tts.runAndWait()
+    # Non-blocking: the camera loop keeps running while speech plays.
+    # Not interrupting, so greetings for several people play in turn.
+    tts.speak(text)
 
 # ===============================
 # MEDIAPIPE
 # ===============================
 mp_face_mesh = mp.solutions.face_mesh
 
-# ===============================
-# UTILS
-# ===============================
-def dist(p1, p2):
-    return math.dist(p1, p2)
-
-# ===============================
-# EMOTION DETECTION (NO ML)
-# ===============================
-def detect_emotion(landmarks):
-    # Mouth
-    left_mouth = landmarks[61]
-    right_mouth = landmarks[291]
-    top_lip = landmarks[13]
-    bottom_lip = landmarks[14]
-
-    # Eye
-    eye_top = landmarks[159]
-    eye_bottom = landmarks[145]
-
-    # Eyebrow
-    eyebrow = landmarks[105]
-    eye_center = landmarks[33]
-
-    mouth_width = dist(left_mouth, right_mouth)
-    mouth_open = dist(top_lip, bottom_lip)
-    eye_open = dist(eye_top, eye_bottom)
-    brow_dist = dist(eyebrow, eye_center)
-
-    mouth_ratio = mouth_open / mouth_width
-    eye_ratio = eye_open / mouth_width
-    brow_ratio = brow_dist / mouth_width
-
-    if mouth_ratio > 0.30:
-        return "surprised"
-    elif mouth_ratio > 0.18:
-        return "happy"
-    elif brow_ratio < 0.07:
-        return "angry"
-    elif eye_ratio < 0.03:
-        return "sad"
-    else:
-        return "neutral"
-
-# ===============================
-# EMOTION SMOOTHER
-# ===============================
-class EmotionSmoother:
-    def __init__(self, size=15):
-        self.buffer = deque(maxlen=size)
-
-    def update(self, emotion):
-        self.buffer.append(emotion)
-        return Counter(self.buffer).most_common(1)[0][0]
-
 # ===============================
 # GREETING
 # ===============================
@@ -96,68 +44,85 @@ def greeting_from_emotion(emotion):
         "neutral": "Hello! How can I help you?"
     }.get(emotion, "Hello!")
 
+EMOTIONS = ["happy", "surprised", "sad", "angry", "neutral"]
+
+def prerender_speech():
+    """Render fixed greetings and intent responses once so they replay instantly"""
+    texts = [greeting_from_emotion(emotion) for emotion in EMOTIONS]
+    try:
+        with open(TRAINING_DATA_PATH, "r", encoding="utf-8") as file:
+            for intent in json.load(file).get("intents", []):
+                texts.extend(intent.get("responses", []))
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Warning: not prerendering intent responses: {e}")
+    tts.prerender(texts)
+
 # ===============================
 # MAIN
 # ===============================
 def main():
-    cap = cv2.VideoCapture(CAMERA_INDEX)
-    if not cap.isOpened():
+    capture = LatestFrameCapture(CAMERA_INDEX)
+    if not capture.is_opened():
         print("❌ Camera not available")
         return
+    capture.start()
 
-    smoother = EmotionSmoother(EMOTION_WINDOW)
-    greeted = False
-    last_greet = 0
+    prerender_speech()
+    tracker = FaceTracker(lambda: EmotionSmoother(EMOTION_WINDOW))
+    frame = None
 
     with mp_face_mesh.FaceMesh(
         static_image_mode=False,
-        max_num_faces=1,
+        max_num_faces=MAX_FACES,
         refine_landmarks=True,
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5
     ) as face_mesh:
 
         while True:
-            ret, frame = cap.read()
+            ret, frame = capture.read(frame)
             if not ret:
                 break
 
             rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             results = face_mesh.process(rgb)
 
-            if results.multi_face_landmarks:
+            now = time.time()
+            faces = results.multi_face_landmarks or []
+            if faces:
                 h, w, _ = frame.shape
-                landmarks = [
-                    (int(lm.x * w), int(lm.y * h))
-                    for lm in results.multi_face_landmarks[0].landmark
-                ]
-
-                emotion = detect_emotion(landmarks)
-                stable_emotion = smoother.update(emotion)
+                points = landmark_array(faces, w, h)
+                boxes = face_boxes(points)
+                emotions = detect_emotions(points)
+            else:
+                boxes, emotions = [], []
 
+            for track in tracker.update(boxes, emotions, now):
                 if DEBUG_DRAW:
+                    x1, y1, x2, y2 = (int(v) for v in track.box)
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 1)
                     cv2.putText(
                         frame,
-                        f"Emotion: {stable_emotion}",
-                        (30, 50),
+                        f"#{track.id}: {track.emotion}",
+                        (x1, max(y1 - 10, 20)),
                         cv2.FONT_HERSHEY_SIMPLEX,
-                        1,
+                        0.7,
                         (0, 255, 0),
                         2
                     )
 
-                if not greeted and time.time() - last_greet > GREETING_COOLDOWN:
-                    speak(greeting_from_emotion(stable_emotion))
-                    greeted = True
-                    last_greet = time.time()
+                if track.ready_to_greet(now, GREETING_COOLDOWN):
+                    speak(greeting_from_emotion(track.emotion))
+                    track.last_greet = now
 
             if DEBUG_DRAW:
                 cv2.imshow("Face Emotion Greeting", frame)
                 if cv2.waitKey(1) & 0xFF == ord("q"):
                     break
 
-    cap.release()
+    capture.stop()
     cv2.destroyAllWindows()
+    tts.stop()
 
 # ===============================
 # ENTRY
@@ -0,0 +1,170 @@
+# intent_store.py
+# Compact in-memory representation of the intent training data
+
+import re
+import sys
+from array import array
+from threading import Lock
+
+# ===============================
+# VOCABULARY
+# ===============================
+class Vocabulary:
+    """Maps normalized words to integer IDs shared by every pattern"""
+    __slots__ = ('ids', 'words', '_lock')
+
+    def __init__(self):
+        self.ids = {}
+        self.words = []
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word):
+        """Return the ID for word, assigning a new one if needed"""
+        word_id = self.ids.get(word)
+        if word_id is not None:
+            return word_id
+        with self._lock:
+            word_id = self.ids.get(word)
+            if word_id is None:
+                word = sys.intern(word)
+                word_id = len(self.words)
+                self.words.append(word)
+                self.ids[word] = word_id
+            return word_id
+
+    def lookup(self, words):
+        """Return IDs of known words, skipping unknown ones (never grows)"""
+        ids = self.ids
+        return {ids[word] for word in words if word in ids}
+
+    def decode(self, tokens):
+        words = self.words
+        return ' '.join([words[token] for token in tokens])
+
+    def nbytes(self):
+        """Approximate memory held by the word table"""
+        return deep_sizeof([self.ids, self.words])
+
+
+# Vocabulary shared by every model in the process unless one is passed in
+shared_vocabulary = Vocabulary()
+
+# ===============================
+# RECORDS
+# ===============================
+class Pattern:
+    """A training pattern viewed as token IDs over a Vocabulary"""
+    __slots__ = ('tokens',)
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def text(self, vocabulary):
+        return vocabulary.decode(self.tokens)
+
+
+class Intent:
+    """An intent tag with its encoded patterns and shared responses
+
+    All patterns of an intent live in one flat token array; pattern i spans
+    tokens[offsets[i]:offsets[i + 1]]. Pattern records are cheap views over it.
+    """
+    __slots__ = ('tag', 'tokens', 'offsets', 'responses')
+
+    def __init__(self, tag, tokens, offsets, responses):
+        self.tag = tag
+        self.tokens = tokens
+        self.offsets = offsets
+        self.responses = responses
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def patterns(self):
+        view = memoryview(self.tokens)
+        offsets = self.offsets
+        return [Pattern(view[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+
+    def __repr__(self):
+        return f"Intent({self.tag!r}, {len(self)} patterns, {len(self.responses)} responses)"
+
+
+def _typecode(max_value):
+    """Smallest unsigned array typecode that can hold max_value"""
+    if max_value < 1 << 8:
+        return 'B'
+    if max_value < 1 << 16:
+        return 'H'
+    return 'I'
+
+
+# ===============================
+# STORE
+# ===============================
+def normalize(text):
+    """Same normalization as HospitalNLPModel.preprocess_text"""
+    text = text.lower().strip()
+    return re.sub(r'[^\w\s]', '', text)
+
+
+class IntentStore:
+    """Builds compact Intent records from the raw JSON intent dicts"""
+
+    def __init__(self, vocabulary=None):
+        self.vocabulary = vocabulary if vocabulary is not None else shared_vocabulary
+        self._responses = {}
+
+    def _response(self, text):
+        # Identical responses (within or across intents) share one object
+        return self._responses.setdefault(text, text)
+
+    def build_intent(self, raw):
+        add = self.vocabulary.add
+        tokens = []
+        offsets = [0]
+        for pattern in raw.get('patterns', []):
+            tokens.extend(add(word) for word in normalize(pattern).split())
+            offsets.append(len(tokens))
+        responses = tuple(self._response(text) for text in raw.get('responses', []))
+        return Intent(
+            sys.intern(raw['tag']),
+            array(_typecode(max(tokens, default=0)), tokens),
+            array(_typecode(len(tokens)), offsets),
+            responses,
+        )
+
+    def build(self, raw_intents):
+        """Convert a list of raw intent dicts into a list of Intent records"""
+        return [self.build_intent(raw) for raw in raw_intents]
+
+# ===============================
+# SIZES
+# ===============================
+def deep_sizeof(obj, seen=None):
+    """Recursively sum sys.getsizeof over obj, counting shared objects once"""
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, (str, bytes, array, int, float)):
+            continue
+        elif hasattr(obj, '__slots__'):
+            for name in obj.__slots__:
+                if hasattr(obj, name):
+                    stack.append(getattr(obj, name))
+    return total
@@ -3,7 +3,11 @@
 # Integrated with MediaPipe-based face emotion greeting
 
 from flask import Flask, render_template_string, request, jsonify
+from model_registry import ModelRegistry, UnknownModelError
+from event_log import EventLogger
 from nlp_model import HospitalNLPModel
+from audio_ingest import (SAMPLE_RATE, MAX_AUDIO_SECONDS, load_recognizer,
+                          pcm16_to_float, read_pcm_stream, transcribe_speech)
 from threading import Thread
 import os
 
@@ -13,14 +17,44 @@ from face_emotion import start_emotion_engine, latest_greeting, lock
 app = Flask(__name__)
 
 # ===============================
-# NLP MODEL INIT
+# NLP MODELS (loaded per site/locale on first use)
 # ===============================
-nlp_model = HospitalNLPModel('./data/training_data.json')
+models = ModelRegistry.from_config('./data/models.json')
+
+def request_key(data=None):
+    """(site, locale) from the body's fields, then query args, then X-Site/X-Locale headers"""
+    data = data or {}
+    site = data.get('site') or request.args.get('site') or request.headers.get('X-Site')
+    locale = data.get('locale') or request.args.get('locale') or request.headers.get('X-Locale')
+    return models.resolve(site, locale)
+
+# ===============================
+# EVENT LOG (batched, written off the request path)
+# ===============================
+events = EventLogger('./logs')
+
+def log_turn(source, key, message, response, intent, score):
+    events.log(
+        'chat',
+        source=source,
+        site=key[0],
+        locale=key[1],
+        message=message,
+        intent=intent.tag if intent else None,
+        score=round(score, 3),
+        matched=bool(intent) and score >= HospitalNLPModel.MATCH_THRESHOLD,
+        response=response,
+    )
+
+# ===============================
+# SPEECH RECOGNIZER (SERVER SIDE)
+# ===============================
+recognizer = load_recognizer()
 
 # ===============================
 # START FACE EMOTION THREAD
 # ===============================
-emotion_thread = Thread(target=start_emotion_engine, daemon=True)
+emotion_thread = Thread(target=start_emotion_engine, kwargs={'events': events}, daemon=True)
 emotion_thread.start()
 
 # ===============================
@@ -144,6 +178,8 @@ HTML_TEMPLATE = '''
 </div>
 
 <script>
+const SITE = {{ site|tojson }};
+const LOCALE = {{ locale|tojson }};
 let recognition;
 let isListening = false;
 let synthesis = window.speechSynthesis;
@@ -153,7 +189,7 @@ let synthesis = window.speechSynthesis;
 // ===============================
 if ('webkitSpeechRecognition' in window) {
     recognition = new webkitSpeechRecognition();
-    recognition.lang = 'en-US';
+    recognition.lang = LOCALE;
 
     recognition.onstart = () => {
         isListening = true;
@@ -171,9 +207,65 @@ if ('webkitSpeechRecognition' in window) {
     };
 }
 
+// ===============================
+// SERVER-SIDE RECOGNITION FALLBACK
+// (browsers without webkitSpeechRecognition)
+// ===============================
+let audioContext, audioStream, audioProcessor, audioChunks = [];
+
+async function startServerRecording() {
+    audioStream = await navigator.mediaDevices.getUserMedia({ audio: true });
+    // Record at the device's own rate (Firefox refuses to resample a mic
+    // stream into a context of another rate); it is sent along as ?rate=
+    audioContext = new AudioContext();
+    const source = audioContext.createMediaStreamSource(audioStream);
+    audioProcessor = audioContext.createScriptProcessor(4096, 1, 1);
+    audioChunks = [];
+    audioProcessor.onaudioprocess = (e) => {
+        const input = e.inputBuffer.getChannelData(0);
+        const pcm = new Int16Array(input.length);
+        for (let i = 0; i < input.length; i++) {
+            pcm[i] = Math.max(-1, Math.min(1, input[i])) * 32767;
+        }
+        audioChunks.push(pcm);
+    };
+    source.connect(audioProcessor);
+    audioProcessor.connect(audioContext.destination);
+    isListening = true;
+    document.getElementById('status').innerText = "Listening... click again to send";
+}
+
+async function stopServerRecording() {
+    audioProcessor.disconnect();
+    audioStream.getTracks().forEach(t => t.stop());
+    const rate = audioContext.sampleRate;
+    await audioContext.close();
+    isListening = false;
+    document.getElementById('status').innerText = "Recognizing...";
+
+    const params = new URLSearchParams({ rate: rate, site: SITE, locale: LOCALE });
+    const res = await fetch("/audio?" + params, {
+        method: "POST",
+        headers: { "Content-Type": "application/octet-stream" },
+        body: new Blob(audioChunks)
+    });
+    const data = await res.json();
+    document.getElementById('status').innerText = "Click the microphone to speak";
+    if (data.transcript) {
+        addMessage(data.transcript, true);
+        addMessage(data.response, false);
+        speak(data.response);
+    }
+}
+
 function toggleVoice() {
-    if (isListening) recognition.stop();
-    else recognition.start();
+    if (recognition) {
+        if (isListening) recognition.stop();
+        else recognition.start();
+    } else {
+        if (isListening) stopServerRecording();
+        else startServerRecording();
+    }
 }
 
 // ===============================
@@ -208,7 +300,7 @@ async function sendMessage() {
     const res = await fetch("/chat", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ message: msg })
+        body: JSON.stringify({ message: msg, site: SITE, locale: LOCALE })
     });
 
     const data = await res.json();
@@ -241,7 +333,8 @@ window.addEventListener("load", async () => {
 # ===============================
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    site, locale = models.resolve(request.args.get('site'), request.args.get('locale'))
+    return render_template_string(HTML_TEMPLATE, site=site, locale=locale)
 
 @app.route('/greeting')
 def greeting():
@@ -252,9 +345,43 @@ def greeting():
 def chat():
     data = request.get_json()
     user_message = data.get('message', '')
-    bot_response = nlp_model.get_response(user_message)
+    key = request_key(data)
+    try:
+        nlp_model = models.get(*key)
+    except UnknownModelError as e:
+        return jsonify({'error': 'no model for site %r, locale %r' % e.args[0]}), 404
+    bot_response, intent, score = nlp_model.respond(user_message)
+    log_turn('text', key, user_message, bot_response, intent, score)
     return jsonify({'response': bot_response})
 
+@app.route('/audio', methods=['POST'])
+def audio():
+    """Accept raw 16-bit little-endian mono PCM (optionally chunked), ?rate=<Hz>"""
+    sample_rate = request.args.get('rate', SAMPLE_RATE, type=int)
+    if not 8000 <= sample_rate <= 48000:
+        return jsonify({'error': 'rate must be between 8000 and 48000'}), 400
+    key = request_key()
+    try:
+        nlp_model = models.get(*key)
+    except UnknownModelError as e:
+        return jsonify({'error': 'no model for site %r, locale %r' % e.args[0]}), 404
+
+    pcm = read_pcm_stream(request.stream, MAX_AUDIO_SECONDS * sample_rate * 2)
+    if pcm is None:
+        return jsonify({'error': f'audio longer than {MAX_AUDIO_SECONDS} seconds'}), 413
+
+    samples = pcm16_to_float(pcm)
+    transcript, segments = transcribe_speech(samples, sample_rate, recognizer)
+    bot_response, intent, score = nlp_model.respond(transcript)
+    log_turn('audio', key, transcript, bot_response, intent, score)
+    return jsonify({
+        'transcript': transcript,
+        'response': bot_response,
+        'audio_seconds': round(len(samples) / sample_rate, 3),
+        'speech_seconds': round(sum(end - start for start, end in segments) / sample_rate, 3),
+        'segments': [[round(start / sample_rate, 3), round(end / sample_rate, 3)] for start, end in segments],
+    })
+
 # ===============================
 # RUN
 # ===============================
@@ -0,0 +1,81 @@
+# memory_report.py
+# Compares bytes per pattern of the raw JSON intents vs the compact IntentStore
+
+import json
+import random
+
+from intent_store import IntentStore, Vocabulary, deep_sizeof
+
+TRAINING_DATA_PATH = './data/training_data_2.json'
+SYNTHETIC_PATTERNS = 1_000_000
+
+# ===============================
+# MEASUREMENT
+# ===============================
+def count_patterns(raw_intents):
+    return sum(len(intent.get('patterns', [])) for intent in raw_intents)
+
+
+def measure(raw_intents):
+    """Return pattern-only and total bytes for the raw and compact forms"""
+    vocabulary = Vocabulary()
+    intents = IntentStore(vocabulary).build(raw_intents)
+    # Vocabulary is shared between models, but count it here to be fair
+    vocabulary_bytes = vocabulary.nbytes()
+    return {
+        'patterns': count_patterns(raw_intents),
+        'vocabulary': len(vocabulary),
+        'vocabulary_bytes': vocabulary_bytes,
+        'raw_patterns': deep_sizeof([intent.get('patterns', []) for intent in raw_intents]),
+        'compact_patterns': deep_sizeof([(intent.tokens, intent.offsets) for intent in intents])
+                            + vocabulary_bytes,
+        'raw_total': deep_sizeof(raw_intents),
+        'compact_total': deep_sizeof(intents) + vocabulary_bytes,
+    }
+
+# ===============================
+# SYNTHETIC CORPUS
+# ===============================
+def synthetic_intents(n_patterns, n_intents=200, n_words=5000, seed=0):
+    """Generate raw intents resembling the training data at a larger scale"""
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(n_words)]
+    responses = [f"Synthetic response number {i}." for i in range(50)]
+    intents = []
+    per_intent = n_patterns // n_intents
+    for i in range(n_intents):
+        # Build each pattern string fresh, like json.load does
+        patterns = [
+            ' '.join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+            for _ in range(per_intent)
+        ]
+        intents.append({
+            'tag': f"intent_{i}",
+            'patterns': patterns,
+            # Fresh copies, so duplicate responses cost what json.load makes them cost
+            'responses': [(r + ' ')[:-1] for r in rng.sample(responses, 5)],
+        })
+    return intents
+
+# ===============================
+# REPORT
+# ===============================
+def report(name, raw_intents):
+    sizes = measure(raw_intents)
+    patterns = sizes['patterns']
+    print(f"{name}: {patterns:,} patterns")
+    for label, key in (('patterns only', 'patterns'), ('whole intents', 'total')):
+        raw_bytes = sizes['raw_' + key]
+        compact_bytes = sizes['compact_' + key]
+        print(f"  {label}")
+        print(f"    raw json dicts : {raw_bytes:>12,} bytes ({raw_bytes / patterns:7.1f} B/pattern)")
+        print(f"    compact store  : {compact_bytes:>12,} bytes ({compact_bytes / patterns:7.1f} B/pattern)")
+        print(f"    saving         : {1 - compact_bytes / raw_bytes:.1%}")
+    print(f"  shared vocabulary: {sizes['vocabulary']:,} words, "
+          f"{sizes['vocabulary_bytes']:,} bytes (included above)")
+
+
+if __name__ == '__main__':
+    with open(TRAINING_DATA_PATH, 'r', encoding='utf-8') as file:
+        report(TRAINING_DATA_PATH, json.load(file).get('intents', []))
+    report(f"synthetic ({SYNTHETIC_PATTERNS:,})", synthetic_intents(SYNTHETIC_PATTERNS))
@@ -0,0 +1,149 @@
+# model_registry.py
+# Per-(site, locale) NLP models, loaded on first use and evicted LRU under a memory budget
+
+import json
+import os
+from collections import OrderedDict
+from threading import Lock
+
+from intent_store import Vocabulary, deep_sizeof
+from nlp_model import HospitalNLPModel
+
+REGISTRY_CONFIG_PATH = './data/models.json'
+MEMORY_BUDGET = 64 * 1024 * 1024     # bytes of intent data and vocabularies kept loaded
+
+
+class UnknownModelError(KeyError):
+    """No training data is configured for the requested (site, locale)"""
+
+
+class _VocabularyUse:
+    """A vocabulary, its measured size, and the models that depend on it"""
+
+    __slots__ = ('locale', 'vocabulary', 'nbytes', 'paths', 'loading')
+
+    def __init__(self, locale):
+        self.locale = locale
+        self.vocabulary = Vocabulary()
+        self.nbytes = 0
+        self.paths = set()       # loaded training files encoded over it
+        self.loading = 0         # loads in progress that are filling it
+
+    def in_use(self):
+        return bool(self.paths) or self.loading > 0
+
+
+class ModelRegistry:
+    """Serves one HospitalNLPModel per (site, locale) key.
+
+    Models are loaded the first time a key is requested, and keys that point
+    at the same training file share one loaded model. Models loaded for a
+    locale encode their patterns over that locale's Vocabulary, so word
+    tables are not duplicated. Model and vocabulary bytes both count against
+    memory_budget; when it is exceeded the least recently used models are
+    evicted (the one just requested is always kept), and a vocabulary is
+    dropped once no loaded or loading model uses it.
+    """
+
+    def __init__(self, paths, default_key, memory_budget=MEMORY_BUDGET):
+        self.paths = dict(paths)                 # (site, locale) -> training data path
+        self.default_key = default_key
+        self.memory_budget = memory_budget
+        self._models = OrderedDict()             # path -> (model, bytes, _VocabularyUse), LRU order
+        self._vocabularies = {}                  # locale -> _VocabularyUse
+        self._loading = {}                       # path -> Lock held while loading it
+        self._lock = Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, path=REGISTRY_CONFIG_PATH, **kwargs):
+        """Build a registry from a JSON file:
+
+        {"default": {"site": ..., "locale": ...},
+         "models": [{"site": ..., "locale": ..., "path": ...}, ...]}
+        """
+        with open(path, 'r', encoding='utf-8') as file:
+            config = json.load(file)
+        base = os.path.dirname(path)
+        paths = {
+            (entry['site'], entry['locale']): os.path.join(base, entry['path'])
+            for entry in config.get('models', [])
+        }
+        default = config['default']
+        return cls(paths, (default['site'], default['locale']), **kwargs)
+
+    def resolve(self, site=None, locale=None):
+        """Fill in defaults for a missing site or locale"""
+        default_site, default_locale = self.default_key
+        return (site or default_site, locale or default_locale)
+
+    def get(self, site=None, locale=None):
+        key = self.resolve(site, locale)
+        path = self.paths.get(key)
+        if path is None:
+            raise UnknownModelError(key)
+
+        with self._lock:
+            entry = self._models.get(path)
+            if entry is not None:
+                self._models.move_to_end(path)
+                return entry[0]
+            load_lock = self._loading.setdefault(path, Lock())
+
+        # Load outside the registry lock so other tenants keep being served;
+        # concurrent requests for the same file wait for one load.
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(path)
+                if entry is not None:
+                    self._models.move_to_end(path)
+                    return entry[0]
+                # Counted as loading so eviction can't drop it from under us
+                use = self._vocabularies.get(key[1])
+                if use is None:
+                    use = self._vocabularies[key[1]] = _VocabularyUse(key[1])
+                use.loading += 1
+
+            try:
+                model = HospitalNLPModel(path, vocabulary=use.vocabulary)
+                size = deep_sizeof(model.intents) + deep_sizeof(model.default_response)
+            except BaseException:
+                with self._lock:
+                    use.loading -= 1
+                    self._release(use)
+                raise
+
+            with self._lock:
+                use.loading -= 1
+                use.paths.add(path)
+                use.nbytes = use.vocabulary.nbytes()
+                self._models[path] = (model, size, use)
+                self.loads += 1
+                self._loading.pop(path, None)
+                self._evict(keep=path)
+        return model
+
+    def _evict(self, keep):
+        while self.memory_used() > self.memory_budget and len(self._models) > 1:
+            path = next(iter(self._models))
+            if path == keep:
+                self._models.move_to_end(path)
+                continue
+            _, _, use = self._models.pop(path)
+            use.paths.discard(path)
+            self._release(use)
+            self.evictions += 1
+            print(f"Evicted NLP model {path} (over {self.memory_budget:,} byte budget)")
+
+    def _release(self, use):
+        """Drop a vocabulary nothing uses any more (call with the lock held)"""
+        if not use.in_use() and self._vocabularies.get(use.locale) is use:
+            del self._vocabularies[use.locale]
+
+    def memory_used(self):
+        models = sum(size for _, size, _ in self._models.values())
+        return models + sum(use.nbytes for use in self._vocabularies.values())
+
+    def loaded(self):
+        return list(self._models)
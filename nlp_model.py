@@ -5,11 +5,15 @@ import json
 import re
 from difflib import SequenceMatcher
 import random
+from intent_store import IntentStore, shared_vocabulary
 
 class HospitalNLPModel:
-    def __init__(self, training_data_path='training_data.json'):
+    MATCH_THRESHOLD = 0.4  # Minimum similarity threshold
+
+    def __init__(self, training_data_path='training_data.json', vocabulary=None):
         """Initialize the NLP model with training data from JSON file"""
         self.training_data_path = training_data_path
+        self.vocabulary = vocabulary if vocabulary is not None else shared_vocabulary
         self.intents = []
         self.default_response = ""
         self.load_training_data()
@@ -19,7 +23,7 @@ class HospitalNLPModel:
         try:
             with open(self.training_data_path, 'r', encoding='utf-8') as file:
                 data = json.load(file)
-                self.intents = data.get('intents', [])
+                self.intents = IntentStore(self.vocabulary).build(data.get('intents', []))
                 self.default_response = data.get('default_response', 
                     "I'm here to help with appointments and hospital information. Could you please rephrase?")
                 print(f"✓ Loaded {len(self.intents)} intent categories from training data")
@@ -40,16 +44,17 @@ class HospitalNLPModel:
         """Calculate similarity ratio between two texts"""
         return SequenceMatcher(None, text1, text2).ratio()
     
-    def find_intent(self, user_input):
-        """Find the best matching intent from training data"""
+    def match_intent(self, user_input):
+        """Return the best scoring intent and its score, without applying the threshold"""
         user_input = self.preprocess_text(user_input)
+        user_words = set(user_input.split())
+        user_ids = self.vocabulary.lookup(user_words)
         best_intent = None
         highest_score = 0.0
-        threshold = 0.4  # Minimum similarity threshold
         
         for intent in self.intents:
-            for pattern in intent['patterns']:
-                pattern_clean = self.preprocess_text(pattern)
+            for pattern in intent.patterns:
+                pattern_clean = pattern.text(self.vocabulary)
                 
                 # Check for exact phrase match
                 if pattern_clean in user_input or user_input in pattern_clean:
@@ -59,9 +64,8 @@ class HospitalNLPModel:
                     score = self.calculate_similarity(user_input, pattern_clean)
                 
                 # Check for keyword presence
-                pattern_words = set(pattern_clean.split())
-                user_words = set(user_input.split())
-                common_words = pattern_words.intersection(user_words)
+                pattern_words = set(pattern.tokens)
+                common_words = pattern_words.intersection(user_ids)
                 
                 if common_words:
                     word_match_score = len(common_words) / max(len(pattern_words), len(user_words))
@@ -71,34 +75,49 @@ class HospitalNLPModel:
                     highest_score = score
                     best_intent = intent
         
+        return best_intent, highest_score
+    
+    def find_intent(self, user_input):
+        """Find the best matching intent from training data"""
+        best_intent, highest_score = self.match_intent(user_input)
+        
         # Return best intent if above threshold
-        if highest_score >= threshold and best_intent:
+        if highest_score >= self.MATCH_THRESHOLD and best_intent:
             return best_intent
         else:
             return None
     
-    def get_response(self, user_input):
-        """Main method to get response for user input"""
+    def respond(self, user_input):
+        """Return (response, best intent, score) for user input.
+        
+        The best intent is returned even when its score is below
+        MATCH_THRESHOLD (and the default response was used), so callers
+        can see what a missed query came closest to.
+        """
         if not user_input or not user_input.strip():
-            return "I didn't catch that. Could you please repeat?"
+            return "I didn't catch that. Could you please repeat?", None, 0.0
         
-        intent = self.find_intent(user_input)
+        intent, score = self.match_intent(user_input)
         
-        if intent:
+        if intent and score >= self.MATCH_THRESHOLD:
             # Return a random response from the intent's responses
-            return random.choice(intent['responses'])
+            return random.choice(intent.responses), intent, score
         else:
-            return self.default_response
+            return self.default_response, intent, score
+    
+    def get_response(self, user_input):
+        """Main method to get response for user input"""
+        return self.respond(user_input)[0]
     
     def is_greeting(self, user_input):
         """Check if input is a greeting"""
         intent = self.find_intent(user_input)
-        return intent and intent['tag'] == 'greeting'
+        return intent and intent.tag == 'greeting'
     
     def is_diagnosis_query(self, user_input):
         """Check if user is asking for diagnosis"""
         intent = self.find_intent(user_input)
-        return intent and intent['tag'] in ['diagnosis', 'symptoms', 'medication']
+        return intent and intent.tag in ['diagnosis', 'symptoms', 'medication']
     
     def reload_training_data(self):
         """Reload training data from JSON file (useful for updates)"""
@@ -0,0 +1,66 @@
+import numpy as np
+
+from audio_ingest import StubRecognizer, detect_speech, transcribe_speech
+
+SR = 16000
+
+
+def voiced(seconds, amplitude=0.3, freq=200):
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def silence(seconds, noise=0.002, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, noise, int(seconds * SR)).astype(np.float32)
+
+
+def test_all_speech_is_transcribed():
+    recognizer = StubRecognizer('book appointment')
+    transcript, segments = transcribe_speech(voiced(2.0), SR, recognizer)
+    assert transcript == 'book appointment'
+    assert recognizer.calls == 1
+    start, end = segments[0]
+    assert (end - start) / SR > 1.9
+
+
+def test_speech_with_little_leading_silence_is_kept():
+    for lead in (0.0, 0.05, 0.1, 0.2):
+        samples = np.concatenate([silence(2.0 * lead), voiced(2.0 * (1 - lead))])
+        segments = detect_speech(samples, SR)
+        assert segments, lead
+        speech = sum(end - start for start, end in segments) / SR
+        assert speech >= 2.0 * (1 - lead) - 0.05, lead
+
+
+def test_speech_plus_silence_only_sends_speech():
+    samples = np.concatenate([silence(1.0), voiced(1.0), silence(1.0, seed=1)])
+    recognizer = StubRecognizer('hello')
+    transcript, segments = transcribe_speech(samples, SR, recognizer)
+    assert transcript == 'hello'
+    assert recognizer.calls == 1
+    start, end = segments[0]
+    assert 0.7 <= start / SR <= 1.0
+    assert 2.0 <= end / SR <= 2.3
+
+
+def test_silence_never_reaches_the_recognizer():
+    recognizer = StubRecognizer('should not be called')
+    transcript, segments = transcribe_speech(silence(2.0), SR, recognizer)
+    assert transcript == ''
+    assert segments == []
+    assert recognizer.calls == 0
+
+
+def test_noisy_background_is_not_sent_as_speech():
+    for noise in (0.01, 0.03, 0.06):
+        samples = np.concatenate([
+            silence(2.0, noise=noise),
+            voiced(1.0) + silence(1.0, noise=noise, seed=1),
+            silence(2.0, noise=noise, seed=2),
+        ])
+        segments = detect_speech(samples, SR)
+        assert len(segments) == 1, noise
+        start, end = segments[0]
+        assert 1.7 <= start / SR <= 2.0, noise
+        assert 3.0 <= end / SR <= 3.3, noise
@@ -0,0 +1,210 @@
+# train_emotion_classifier.py
+# Trains the landmark emotion classifier and exports it for NumPy-only inference.
+#
+# Usage:
+#   python train_emotion_classifier.py record            # label faces from the camera
+#   python train_emotion_classifier.py train             # fit, compare with rules, export
+#   python train_emotion_classifier.py train --hidden 0  # softmax regression instead of MLP
+#
+# Dataset format (DATASET_PATH, .npz):
+#   points: (samples, landmarks, 2) int pixel landmarks, as from landmark_array
+#   labels: (samples,) emotion strings
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+import face_tracking
+from emotion_classifier import MODEL_PATH, EmotionClassifier, landmark_features
+
+DATASET_PATH = './data/emotion_landmarks.npz'
+RECORD_KEYS = {'h': "happy", 'u': "surprised", 's': "sad", 'a': "angry", 'n': "neutral"}
+
+# ===============================
+# DATASET
+# ===============================
+def load_dataset(path=DATASET_PATH):
+    with np.load(path, allow_pickle=False) as data:
+        return data['points'], np.array([str(label) for label in data['labels']])
+
+
+def save_dataset(points, labels, path=DATASET_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    np.savez_compressed(path, points=np.asarray(points, dtype=np.int32), labels=np.asarray(labels))
+
+
+def record(path=DATASET_PATH, camera_index=0):
+    """Label the current face by key press: h/u/s/a/n, q to save and quit"""
+    import cv2
+    import mediapipe as mp
+    from frame_capture import LatestFrameCapture
+
+    points, labels = [], []
+    if os.path.exists(path):
+        old_points, old_labels = load_dataset(path)
+        points, labels = list(old_points), list(old_labels)
+    print(f"Recording into {path} ({len(labels)} existing samples)")
+    print("Keys: " + ", ".join(f"{k}={v}" for k, v in RECORD_KEYS.items()) + ", q=save and quit")
+
+    capture = LatestFrameCapture(camera_index).start()
+    frame = None
+    with mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True) as face_mesh:
+        while True:
+            ret, frame = capture.read(frame)
+            if not ret:
+                break
+            results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            cv2.putText(frame, f"{len(labels)} samples", (30, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.imshow("Record emotion samples", frame)
+            key = chr(cv2.waitKey(1) & 0xFF)
+            if key == 'q':
+                break
+            if key in RECORD_KEYS and results.multi_face_landmarks:
+                h, w, _ = frame.shape
+                points.append(face_tracking.landmark_array(results.multi_face_landmarks[:1], w, h)[0])
+                labels.append(RECORD_KEYS[key])
+
+    capture.stop()
+    cv2.destroyAllWindows()
+    save_dataset(points, labels, path)
+    print(f"✓ Saved {len(labels)} samples to {path}")
+
+# ===============================
+# TRAINING
+# ===============================
+def split(n, test_fraction, rng):
+    order = rng.permutation(n)
+    n_test = max(1, int(n * test_fraction))
+    return order[n_test:], order[:n_test]
+
+
+def init_layers(sizes, rng):
+    return [
+        [rng.normal(0, np.sqrt(2.0 / fan_in), (fan_in, fan_out)).astype(np.float32),
+         np.zeros(fan_out, dtype=np.float32)]
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:])
+    ]
+
+
+def fit(X, y, n_classes, hidden=32, epochs=500, lr=0.01, l2=1e-4, seed=0):
+    """Full-batch Adam on softmax cross-entropy; returns [[W, b], ...]"""
+    rng = np.random.default_rng(seed)
+    sizes = [X.shape[1]] + ([hidden] if hidden else []) + [n_classes]
+    layers = init_layers(sizes, rng)
+    moments = [[np.zeros_like(p) for p in layer] for layer in layers]
+    velocities = [[np.zeros_like(p) for p in layer] for layer in layers]
+    onehot = np.eye(n_classes, dtype=np.float32)[y]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    for step in range(1, epochs + 1):
+        # Forward, keeping activations for backprop
+        activations = [X]
+        for i, (W, b) in enumerate(layers):
+            z = activations[-1] @ W + b
+            activations.append(np.maximum(z, 0) if i < len(layers) - 1 else z)
+        z = activations[-1] - activations[-1].max(axis=1, keepdims=True)
+        p = np.exp(z)
+        p /= p.sum(axis=1, keepdims=True)
+
+        # Backward
+        grad = (p - onehot) / len(X)
+        for i in reversed(range(len(layers))):
+            W, b = layers[i]
+            grads = [activations[i].T @ grad + l2 * W, grad.sum(axis=0)]
+            if i > 0:
+                grad = (grad @ W.T) * (activations[i] > 0)
+            for j, g in enumerate(grads):
+                moments[i][j] = beta1 * moments[i][j] + (1 - beta1) * g
+                velocities[i][j] = beta2 * velocities[i][j] + (1 - beta2) * g * g
+                m_hat = moments[i][j] / (1 - beta1 ** step)
+                v_hat = velocities[i][j] / (1 - beta2 ** step)
+                layers[i][j] -= lr * m_hat / (np.sqrt(v_hat) + eps)
+    return layers
+
+
+def export(path, layers, mean, std, labels):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    arrays = {'labels': np.array(labels), 'mean': mean, 'std': std}
+    for i, (W, b) in enumerate(layers):
+        arrays[f'W{i}'] = W
+        arrays[f'b{i}'] = b
+    np.savez(path, **arrays)
+
+# ===============================
+# EVALUATION
+# ===============================
+def per_face_latency(fn, points, repeats=5):
+    """Best-of-repeats seconds per face for fn over the whole batch"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(points)
+        best = min(best, time.perf_counter() - start)
+    return best / len(points)
+
+
+def compare(classifier, points, labels):
+    def one_face_per_call(batch):
+        # How a drop-in detect_emotion is called from a single-face loop
+        return [classifier.predict(face[None])[0] for face in batch]
+
+    rows = [
+        ("threshold rules (batched)", face_tracking.detect_emotions),
+        ("learned classifier (batched)", classifier.predict),
+        ("learned classifier (per face)", one_face_per_call),
+    ]
+    print(f"{'method':<30} {'accuracy':>9} {'µs/face':>9}")
+    for name, fn in rows:
+        accuracy = np.mean(np.array(fn(points)) == labels)
+        latency = per_face_latency(fn, points) * 1e6
+        print(f"{name:<30} {accuracy:>9.1%} {latency:>9.1f}")
+
+
+def train(dataset=DATASET_PATH, output=MODEL_PATH, hidden=32, epochs=500, test_fraction=0.2, seed=0):
+    points, labels = load_dataset(dataset)
+    classes = sorted(set(labels))
+    y = np.array([classes.index(label) for label in labels])
+    print(f"Loaded {len(labels)} samples: " +
+          ", ".join(f"{c}={int(np.sum(labels == c))}" for c in classes))
+
+    X = landmark_features(points)
+    train_idx, test_idx = split(len(X), test_fraction, np.random.default_rng(seed))
+    mean = X[train_idx].mean(axis=0)
+    std = X[train_idx].std(axis=0) + 1e-6
+    layers = fit((X[train_idx] - mean) / std, y[train_idx], len(classes),
+                 hidden=hidden, epochs=epochs, seed=seed)
+
+    export(output, layers, mean, std, classes)
+    print(f"✓ Exported {'MLP' if hidden else 'softmax regression'} weights to {output}")
+
+    # Compare on the held-out split, loading exactly what production will load
+    compare(EmotionClassifier(output), points[test_idx], labels[test_idx])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the landmark emotion classifier")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help="record labeled landmark samples from the camera")
+    rec.add_argument('--dataset', default=DATASET_PATH)
+    rec.add_argument('--camera', type=int, default=0)
+
+    tr = sub.add_parser('train', help="fit, evaluate against the threshold rules and export")
+    tr.add_argument('--dataset', default=DATASET_PATH)
+    tr.add_argument('-o', '--output', default=MODEL_PATH)
+    tr.add_argument('--hidden', type=int, default=32, help="hidden units; 0 for softmax regression")
+    tr.add_argument('--epochs', type=int, default=500)
+    tr.add_argument('--test-fraction', type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+    if args.command == 'record':
+        record(args.dataset, args.camera)
+    else:
+        train(args.dataset, args.output, args.hidden, args.epochs, args.test_fraction)
+
+
+if __name__ == '__main__':
+    main()
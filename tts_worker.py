@@ -0,0 +1,198 @@
+# tts_worker.py
+# Non-blocking text-to-speech: a worker thread fed by a bounded queue,
+# with an on-disk cache of synthesized audio
+
+import hashlib
+import json
+import os
+import queue
+import time
+from collections import deque
+from threading import Event, Lock, Thread
+
+import pyttsx3
+
+try:
+    import simpleaudio
+except ImportError:      # cached playback needs simpleaudio; fall back to live speech
+    simpleaudio = None
+
+# ===============================
+# CONFIG
+# ===============================
+TTS_RATE = 170
+TTS_CACHE_DIR = './data/tts_cache'
+TTS_QUEUE_SIZE = 4        # pending utterances; oldest are dropped beyond this
+TTS_MAX_AGE = 5.0         # seconds before a queued utterance is considered stale
+
+
+class TTSWorker:
+    """Speaks text on a background thread so callers (e.g. the camera loop) never block.
+
+    pyttsx3 engines are not thread safe, so the engine is created and used only
+    on the worker thread. Audio is rendered once to TTS_CACHE_DIR, keyed by a
+    hash of the text and voice settings, and replayed from there.
+    """
+
+    def __init__(self, rate=TTS_RATE, voice=None, cache_dir=TTS_CACHE_DIR,
+                 queue_size=TTS_QUEUE_SIZE, max_age=TTS_MAX_AGE):
+        self.rate = rate
+        self.voice = voice
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.prerender_queue = deque()
+        self.dropped = 0
+        self._generation = 0
+        self._lock = Lock()
+        self._cancelled = Event()
+        self._stopped = Event()
+        self._playing = None
+        os.makedirs(cache_dir, exist_ok=True)
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # -------------------------------
+    # Public API (any thread)
+    # -------------------------------
+    def speak(self, text, interrupt=False):
+        """Queue text to be spoken; returns immediately"""
+        print(f"[SPEAK]: {text}")
+        if interrupt:
+            self.cancel()
+        item = (self._generation, time.monotonic(), text)
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                # Drop the oldest utterance rather than block the caller
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def cancel(self):
+        """Drop everything queued so far and stop the current utterance"""
+        with self._lock:
+            self._generation += 1
+            self._cancelled.set()
+            if self._playing is not None:
+                self._playing.stop()
+
+    def prerender(self, texts):
+        """Render texts into the cache in the background, when nothing is being spoken"""
+        self.prerender_queue.extend(texts)
+
+    def stop(self):
+        self._stopped.set()
+        self.cancel()
+
+    def cache_path(self, text):
+        key = json.dumps({'text': text, 'rate': self.rate, 'voice': self.voice}, sort_keys=True)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.wav")
+
+    # -------------------------------
+    # Worker thread
+    # -------------------------------
+    def _run(self):
+        try:
+            self.engine = pyttsx3.init()
+            self.engine.setProperty('rate', self.rate)
+            if self.voice is not None:
+                self.engine.setProperty('voice', self.voice)
+        except Exception as e:
+            # Keep draining the queue so speak() stays cheap; text is still printed
+            print(f"Warning: TTS engine unavailable, speech disabled: {e}")
+            self.engine = None
+
+        while not self._stopped.is_set():
+            try:
+                generation, queued_at, text = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                if self.prerender_queue and self.engine is not None:
+                    text = self.prerender_queue.popleft()
+                    try:
+                        self._render(text)
+                    except Exception as e:
+                        print(f"Warning: could not prerender {text!r}: {e}")
+                continue
+
+            stale = time.monotonic() - queued_at > self.max_age
+            if generation != self._generation or stale or self.engine is None:
+                self.dropped += 1
+                continue
+            self._cancelled.clear()
+            # One bad utterance must never take the worker down with it
+            try:
+                self._say(text)
+            except Exception as e:
+                print(f"Warning: could not speak {text!r}: {e}")
+
+    def _render(self, text):
+        """Synthesize text into the cache (no-op if already cached)"""
+        path = self.cache_path(text)
+        if not os.path.exists(path):
+            # Write to a temp name so a half-written file is never played
+            tmp_path = path + '.tmp'
+            try:
+                self.engine.save_to_file(text, tmp_path)
+                self.engine.runAndWait()
+                # Some drivers (e.g. macOS) write AIFF whatever the extension says
+                if not _is_wav(tmp_path):
+                    raise RuntimeError("TTS engine did not produce a WAV file")
+                os.replace(tmp_path, path)
+            finally:
+                _remove(tmp_path)
+        return path
+
+    def _say_live(self, text):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def _say(self, text):
+        if simpleaudio is None:
+            self._say_live(text)
+            return
+
+        try:
+            path = self._render(text)
+        except Exception as e:
+            print(f"Warning: TTS cache unavailable ({e}); speaking live")
+            self._say_live(text)
+            return
+
+        if self._cancelled.is_set():
+            return
+        try:
+            with self._lock:
+                if self._cancelled.is_set():
+                    return
+                self._playing = simpleaudio.WaveObject.from_wave_file(path).play()
+            self._playing.wait_done()
+        except Exception as e:
+            # Unreadable cache file or no audio device: drop the file, speak live
+            print(f"Warning: cached playback failed ({e}); speaking live")
+            _remove(path)
+            self._say_live(text)
+        finally:
+            with self._lock:
+                self._playing = None
+
+
+def _is_wav(path):
+    try:
+        with open(path, 'rb') as file:
+            header = file.read(12)
+    except OSError:
+        return False
+    return header[:4] == b'RIFF' and header[8:12] == b'WAVE'
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass